@@ -0,0 +1,76 @@
+import asyncio
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from aiohttp import web
+from check_dropbox_links import LinkHealthChecker, build_report
+
+# links n % BROKEN_EVERY == 1..5 are 404, an html page, HEAD-not-allowed (still ok), a redirect loop
+# and a folder link, so the report should show each failure class
+BROKEN_EVERY = 500
+
+async def serve_image(request):
+    n = int(request.match_info['n'])
+    await asyncio.sleep(request.app['latency'])
+    kind = n % BROKEN_EVERY
+    if kind == 1:
+        return web.Response(status=404)
+    if kind == 2:
+        return web.Response(text="<html>link revoked</html>", content_type="text/html")
+    if kind == 3 and request.method == "HEAD":
+        return web.Response(status=405)
+    if kind == 4:
+        raise web.HTTPFound(f"/img/{n + BROKEN_EVERY}.png")
+    return web.Response(body=b"\x89PNG\r\n\x1a\n", content_type="image/png")
+
+def make_links(base_url: str, count: int):
+    questions = []
+    for i in range(count):
+        link = f"{base_url}/img/{i}.png?raw=1"
+        if i % BROKEN_EVERY == 5:
+            link = "https://www.dropbox.com/scl/fo/standin/q.png?raw=1"
+        questions.append({
+            "dropbox_path": f"/question_images/standin/q{i}.png",
+            "local_path": f"question_images/standin/q{i}.png",
+            "direct_link": link
+        })
+    return questions
+
+async def run(count: int, concurrency: int, latency: float, port: int):
+    app = web.Application()
+    app['latency'] = latency
+    app.router.add_route("*", "/img/{n}.png", serve_image)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    try:
+        questions = make_links(f"http://127.0.0.1:{port}", count)
+        checker = LinkHealthChecker(concurrency=concurrency, retries=0)
+        start = time.perf_counter()
+        results = await checker.check_all(questions)
+        return build_report(results, time.perf_counter() - start)
+    finally:
+        await runner.cleanup()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run check_dropbox_links.py against a local stand-in server")
+    parser.add_argument('--count', type=int, default=3200, help='Number of links to check')
+    parser.add_argument('--concurrency', type=int, default=64, help='Maximum simultaneous requests')
+    parser.add_argument('--latency', type=float, default=0.02, help='Simulated server latency in seconds')
+    parser.add_argument('--port', type=int, default=8765, help='Port for the stand-in server')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.count, args.concurrency, args.latency, args.port))
+    print(f"Checked {report['total']} links in {report['elapsed_seconds']}s "
+          f"({report['links_per_second']} links/s, {args.concurrency} concurrent)")
+    for status, count in sorted(report["summary"].items()):
+        print(f"  {status}: {count}")
+    report_path = Path(tempfile.gettempdir()) / "link_checker_bench.json"
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report saved to: {report_path}")
+
+if __name__ == "__main__":
+    main()
@@ -66,7 +66,7 @@ function createCategoryItem(category) {
     li.className = 'category-item';
     const link = document.createElement('a');
     link.className = 'category-link';
-    link.href = `questions.html?mode=category&category=${category.slug}`;
+    link.href = `pages/category-${category.slug}.html`;
     const content = document.createElement('div');
     content.className = 'category-content';
     const text = document.createElement('div');
@@ -0,0 +1,205 @@
+import asyncio
+import json
+import time
+import argparse
+from collections import Counter
+from dataclasses import dataclass, asdict, replace
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import aiohttp
+
+LINKS_FILE = "dropbox_question_links.json"
+REPORT_FILE = "link_health_report.json"
+
+RETRYABLE = {"rate_limited", "server_error", "timeout", "connection_error"}
+# failures that mean the link itself is bad; anything else may be a healthy link on a bad day
+REGENERATE = {"not_found", "forbidden", "not_image", "folder_link"}
+
+@dataclass
+class LinkResult:
+    dropbox_path: Optional[str]
+    local_path: Optional[str]
+    direct_link: Optional[str]
+    status: str = "unchecked"
+    http_status: Optional[int] = None
+    content_type: Optional[str] = None
+    attempts: int = 0
+    detail: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+class LinkHealthChecker:
+    def __init__(self, concurrency: int = 64, timeout: float = 15.0, retries: int = 2):
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.checked = 0
+
+    async def check_all(self, questions: List[Dict]) -> List[LinkResult]:
+        results: List[Optional[LinkResult]] = [None] * len(questions)
+        # duplicates share their canonical image's link, so each distinct url is requested once
+        by_link: Dict[Optional[str], List[int]] = {}
+        for i, q in enumerate(questions):
+            by_link.setdefault(q.get("direct_link"), []).append(i)
+        queue: asyncio.Queue = asyncio.Queue()
+        for indices in by_link.values():
+            queue.put_nowait(indices[0])
+
+        # one pooled keep-alive connector shared by all workers; the pool size bounds concurrency
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency,
+                                         ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout) as session:
+            async def worker():
+                while True:
+                    try:
+                        i = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    result = await self.check_link(session, questions[i])
+                    for j in by_link[questions[i].get("direct_link")]:
+                        results[j] = replace(result, dropbox_path=questions[j].get("dropbox_path"),
+                                             local_path=questions[j].get("local_path"))
+                    self.checked += 1
+                    if self.checked % 500 == 0:
+                        print(f"  Progress: {self.checked}/{len(by_link)} links checked...")
+
+            workers = min(self.concurrency, len(by_link))
+            await asyncio.gather(*(worker() for _ in range(workers)))
+        return results
+
+    async def check_link(self, session: aiohttp.ClientSession, question: Dict) -> LinkResult:
+        result = LinkResult(
+            dropbox_path=question.get("dropbox_path"),
+            local_path=question.get("local_path"),
+            direct_link=question.get("direct_link")
+        )
+        url = result.direct_link
+        if not url or not url.startswith(("http://", "https://")):
+            result.status = "malformed"
+            result.detail = "missing or non-http link"
+            return result
+        if "/scl/fo/" in url:
+            result.status = "folder_link"
+            result.detail = "folder shared link, run generate_dropbox_links.py --fix-links"
+            return result
+
+        for attempt in range(self.retries + 1):
+            result.attempts = attempt + 1
+            self._classify(result, *await self._request(session, url))
+            if result.status not in RETRYABLE or attempt == self.retries:
+                break
+            await asyncio.sleep(0.5 * 2 ** attempt)
+        return result
+
+    async def _request(self, session: aiohttp.ClientSession, url: str):
+        try:
+            async with session.head(url, allow_redirects=True) as response:
+                if response.status not in (405, 501):
+                    return response.status, response.headers.get("Content-Type", ""), None, ""
+            # HEAD not supported, fetch a single byte instead
+            async with session.get(url, headers={"Range": "bytes=0-0"}, allow_redirects=True) as response:
+                await response.read()
+                return response.status, response.headers.get("Content-Type", ""), None, ""
+        except asyncio.TimeoutError:
+            return None, "", "timeout", ""
+        except aiohttp.TooManyRedirects as e:
+            return None, "", "redirect_loop", str(e)
+        except aiohttp.ClientError as e:
+            return None, "", "connection_error", str(e)
+
+    def _classify(self, result: LinkResult, http_status: Optional[int], content_type: str,
+                  error: Optional[str], detail: str):
+        result.http_status = http_status
+        result.content_type = content_type or None
+        result.detail = detail
+        if error:
+            result.status = error
+        elif http_status in (200, 206):
+            # revoked dropbox links still answer 200, but with an html page instead of the image
+            if content_type.startswith("image/") or content_type.startswith("application/octet-stream"):
+                result.status = "ok"
+            else:
+                result.status = "not_image"
+                result.detail = f"unexpected content type {content_type or 'none'}"
+        elif http_status in (404, 410):
+            result.status = "not_found"
+        elif http_status in (401, 403):
+            result.status = "forbidden"
+        elif http_status == 429:
+            result.status = "rate_limited"
+        elif http_status >= 500:
+            result.status = "server_error"
+        else:
+            result.status = "unexpected_status"
+
+def build_report(results: List[LinkResult], elapsed: float) -> Dict:
+    failures = [r for r in results if not r.ok]
+    return {
+        "checked_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "total": len(results),
+        "distinct_links": len({r.direct_link for r in results}),
+        "ok": len(results) - len(failures),
+        "failed": len(failures),
+        "elapsed_seconds": round(elapsed, 2),
+        "links_per_second": round(len(results) / elapsed, 1) if elapsed > 0 else None,
+        "summary": dict(Counter(r.status for r in results)),
+        "failures": [asdict(r) for r in failures]
+    }
+
+def check_links(links_file: str = LINKS_FILE, report_path: str = REPORT_FILE,
+                concurrency: int = 64, timeout: float = 15.0, retries: int = 2) -> Dict:
+    with open(links_file, 'r') as f:
+        questions = json.load(f)
+    distinct = len({q.get("direct_link") for q in questions})
+    print(f"Checking {len(questions)} links, {distinct} distinct ({concurrency} concurrent)...")
+    checker = LinkHealthChecker(concurrency=concurrency, timeout=timeout, retries=retries)
+    start = time.perf_counter()
+    results = asyncio.run(checker.check_all(questions))
+    report = build_report(results, time.perf_counter() - start)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nChecked {report['total']} links in {report['elapsed_seconds']}s "
+          f"({report['links_per_second']} links/s)")
+    for status, count in sorted(report["summary"].items()):
+        print(f"  {status}: {count}")
+    print(f"Report saved to: {report_path}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check every direct_link in the question link database")
+    parser.add_argument('--links', type=str, default=LINKS_FILE,
+                       help='Question link database to check')
+    parser.add_argument('--report', type=str, default=REPORT_FILE,
+                       help='Where to write the JSON report')
+    parser.add_argument('--concurrency', type=int, default=64,
+                       help='Maximum simultaneous requests (connection pool size)')
+    parser.add_argument('--timeout', type=float, default=15.0,
+                       help='Per-request timeout in seconds')
+    parser.add_argument('--retries', type=int, default=2,
+                       help='Retries for rate limits, timeouts and server errors')
+    parser.add_argument('--regenerate', action='store_true',
+                       help='Recreate Dropbox links for failed files afterwards')
+    parser.add_argument('--token', type=str,
+                       help='Dropbox access token for --regenerate (will prompt if not provided)')
+    args = parser.parse_args()
+
+    report = check_links(args.links, args.report, args.concurrency, args.timeout, args.retries)
+    failed_paths = sorted({r["dropbox_path"] for r in report["failures"]
+                           if r["dropbox_path"] and r["status"] in REGENERATE})
+    if args.regenerate and failed_paths:
+        skipped = report["failed"] - sum(1 for r in report["failures"] if r["status"] in REGENERATE)
+        print(f"\n{len(failed_paths)} files have broken links ({', '.join(sorted(REGENERATE))})")
+        if skipped:
+            print(f"{skipped} transient failures are left alone, rerun the check later")
+        print("Their existing shared links will be revoked and recreated.")
+        confirm = input("\nProceed with regenerating links? (yes/no): ").strip().lower()
+        if confirm != 'yes':
+            print("Cancelled.")
+        else:
+            from generate_dropbox_links import regenerate_links
+            access_token = args.token if args.token else input("Dropbox access token: ").strip()
+            regenerate_links(access_token, failed_paths, args.links)
+    exit(1 if report["failed"] else 0)
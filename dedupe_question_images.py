@@ -0,0 +1,252 @@
+import json
+import argparse
+from pathlib import Path
+from typing import Dict, List, Tuple
+from PIL import Image, ImageChops, ImageDraw
+from generate_asset_manifest import write_manifest
+from generate_static_pages import write_pages
+
+IMAGES_DIR = "question_images"
+LINKS_FILE = "dropbox_question_links.json"
+PARSED_DIR = "parsed_exams"
+INDEX_FILE = "question_image_dedup.json"
+# 16x16 gradient bits; an 8x8 hash is too coarse for crops that are mostly lines of text
+HASH_SIZE = 16
+DEFAULT_THRESHOLD = 20
+ASPECT_TOLERANCE = 0.1
+TYPE_ORDER = {"local": 0, "national": 1}
+# pixels darker than this count as ink when looking for the question number
+INK_LEVEL = 160
+# largest per-pixel grey difference still treated as the same image (PNG round-trips are lossless)
+PIXEL_TOLERANCE = 8
+
+def difference_hash(path: Path) -> int:
+    # dHash: shrink to (HASH_SIZE + 1) x HASH_SIZE grayscale and record whether each pixel is brighter than its right neighbour
+    with Image.open(path) as img:
+        small = img.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+        pixels = list(small.tobytes())
+    value = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + col]
+            right = pixels[row * (HASH_SIZE + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+def question_number_box(img: Image.Image) -> Tuple[int, int, int, int]:
+    # the crop starts with the question number: the first word of the first line of ink.
+    # characters are a pixel or two apart, words at least a quarter of the line height
+    width, height = img.size
+    pixels = img.tobytes()
+    ink_rows = [min(pixels[y * width:(y + 1) * width]) < INK_LEVEL for y in range(height)]
+    if not any(ink_rows):
+        return (0, 0, 0, 0)
+    top = bottom = ink_rows.index(True)
+    while bottom + 1 < height and ink_rows[bottom + 1]:
+        bottom += 1
+    word_gap = max(2, (bottom - top + 1) // 4)
+    left = right = None
+    gap = 0
+    for x in range(width):
+        if any(pixels[y * width + x] < INK_LEVEL for y in range(top, bottom + 1)):
+            if left is None:
+                left = x
+            right = x
+            gap = 0
+        elif left is not None:
+            gap += 1
+            if gap >= word_gap:
+                break
+    return (0, top, right + 1, bottom + 1)
+
+def same_question_image(a: Path, b: Path) -> bool:
+    # dHash can't see a changed value ("250 mL" vs "350 mL"), so compare every pixel,
+    # leaving out only the question number, which differs between exams
+    with Image.open(a) as img_a, Image.open(b) as img_b:
+        if img_a.size != img_b.size:
+            return False
+        gray_a, gray_b = img_a.convert("L"), img_b.convert("L")
+    box_a, box_b = question_number_box(gray_a), question_number_box(gray_b)
+    # the mask covers the wider of the two numbers, so text after it must line up exactly
+    box = (0, min(box_a[1], box_b[1]), max(box_a[2], box_b[2]), max(box_a[3], box_b[3]))
+    if box[2] > 0:
+        for gray in (gray_a, gray_b):
+            ImageDraw.Draw(gray).rectangle((box[0], box[1], box[2] - 1, box[3] - 1), fill=255)
+    return ImageChops.difference(gray_a, gray_b).getextrema()[1] <= PIXEL_TOLERANCE
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def load_answers(parsed_dir: str = PARSED_DIR) -> Dict[str, str]:
+    # same answer keys generate_dropbox_links.py reads, keyed by image path
+    answers = {}
+    for answer_key_file in sorted(Path(parsed_dir).glob("*/*_answer_key.json")):
+        with open(answer_key_file, 'r') as f:
+            for q in json.load(f):
+                if q.get("image_path") and q.get("answer"):
+                    answers[q["image_path"]] = q["answer"]
+    return answers
+
+class NearDuplicateIndex:
+    # multi-index hashing: split the hash bits into threshold + 1 bands. Two hashes within `threshold`
+    # bits must agree exactly on at least one band, so only hashes sharing a band are compared.
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        bits = HASH_SIZE * HASH_SIZE
+        bands = threshold + 1
+        edges = [round(i * bits / bands) for i in range(bands + 1)]
+        self.bands = [(edges[i], edges[i + 1] - edges[i]) for i in range(bands)]
+        self.tables: List[Dict[int, List[int]]] = [{} for _ in self.bands]
+        self.hashes: List[int] = []
+
+    def _band_keys(self, value: int) -> List[int]:
+        return [(value >> shift) & ((1 << width) - 1) for shift, width in self.bands]
+
+    def add(self, value: int) -> int:
+        item_id = len(self.hashes)
+        self.hashes.append(value)
+        for table, key in zip(self.tables, self._band_keys(value)):
+            table.setdefault(key, []).append(item_id)
+        return item_id
+
+    def neighbours(self, value: int) -> List[Tuple[int, int]]:
+        candidates = set()
+        for table, key in zip(self.tables, self._band_keys(value)):
+            candidates.update(table.get(key, ()))
+        result = []
+        for item_id in candidates:
+            distance = hamming(value, self.hashes[item_id])
+            if distance <= self.threshold:
+                result.append((item_id, distance))
+        return sorted(result, key=lambda pair: (pair[1], pair[0]))
+
+class QuestionImageDeduplicator:
+    def __init__(self, images_dir: str = IMAGES_DIR, threshold: int = DEFAULT_THRESHOLD,
+                 answers: Dict[str, str] = None):
+        self.images_dir = Path(images_dir)
+        self.threshold = threshold
+        self.answers = answers or {}
+        # only canonical images go into the index, so clusters can't chain through intermediate images
+        self.index = NearDuplicateIndex(threshold)
+        self.canonicals: List[Tuple[str, float]] = []
+        self.clusters: Dict[str, Dict] = {}
+        self.total_images = 0
+
+    def build(self) -> Dict:
+        image_files = sorted(self.images_dir.glob("*/*/q*.png"), key=self._sort_key)
+        print(f"Hashing {len(image_files)} question images...")
+        for i, image_file in enumerate(image_files):
+            if (i + 1) % 500 == 0:
+                print(f"  Progress: {i+1}/{len(image_files)} images hashed...")
+            self._add(image_file)
+        return self._build_report()
+
+    def _sort_key(self, path: Path):
+        # canonical image is the earliest appearance: oldest year, local before national, lowest number
+        year, exam_type, name = path.parts[-3:]
+        return (int(year) if year.isdigit() else 9999, TYPE_ORDER.get(exam_type, 9), name)
+
+    def _add(self, image_file: Path):
+        self.total_images += 1
+        value = difference_hash(image_file)
+        with Image.open(image_file) as img:
+            aspect = img.height / img.width if img.width else 0.0
+        path = image_file.as_posix()
+        for canonical_id, distance in self.index.neighbours(value):
+            canonical, canonical_aspect = self.canonicals[canonical_id]
+            # crops of the same question have the same shape; this rules out most hash collisions
+            if abs(canonical_aspect - aspect) <= ASPECT_TOLERANCE * max(aspect, canonical_aspect):
+                cluster = self.clusters.setdefault(canonical, {
+                    "canonical": canonical, "answer": self.answers.get(canonical),
+                    "exact": [], "review": [], "max_distance": 0})
+                answer = self.answers.get(path)
+                # the hash only finds candidates (the question number alone moves it a few bits); sharing
+                # a link needs the same answer and the same pixels apart from the number, the rest is for review
+                if answer and answer == cluster["answer"] and same_question_image(Path(canonical), image_file):
+                    cluster["exact"].append(path)
+                else:
+                    cluster["review"].append({"path": path, "distance": distance, "answer": answer})
+                cluster["max_distance"] = max(cluster["max_distance"], distance)
+                return
+        self.index.add(value)
+        self.canonicals.append((path, aspect))
+
+    def _build_report(self) -> Dict:
+        canonical_map = {member: cluster["canonical"]
+                         for cluster in self.clusters.values()
+                         for member in cluster["exact"]}
+        review_clusters = [cluster for cluster in self.clusters.values() if cluster["review"]]
+        return {
+            "threshold": self.threshold,
+            "hash_bits": HASH_SIZE * HASH_SIZE,
+            "total_images": self.total_images,
+            "unique_images": len(self.canonicals),
+            "duplicate_images": len(canonical_map),
+            "review_images": sum(len(cluster["review"]) for cluster in review_clusters),
+            "clusters": list(self.clusters.values()),
+            "review_clusters": review_clusters,
+            "canonical_map": canonical_map
+        }
+
+def load_canonical_map(index_path: str = INDEX_FILE) -> Dict[str, str]:
+    if not Path(index_path).exists():
+        return {}
+    with open(index_path, 'r', encoding='utf-8') as f:
+        return json.load(f).get("canonical_map", {})
+
+def apply_to_links(canonical_map: Dict[str, str], links_file: str = LINKS_FILE) -> int:
+    with open(links_file, 'r', encoding='utf-8') as f:
+        questions = json.load(f)
+    by_path = {q["local_path"]: q for q in questions}
+    updated = 0
+    unmerged = []
+    for q in questions:
+        canonical = by_path.get(canonical_map.get(q["local_path"]))
+        if canonical and canonical.get("answer") == q.get("answer"):
+            q["duplicate_of"] = canonical["local_path"]
+            q["direct_link"] = canonical["direct_link"]
+            updated += 1
+        elif q.pop("duplicate_of", None):
+            unmerged.append(q["local_path"])
+    with open(links_file, 'w', encoding='utf-8') as f:
+        json.dump(questions, f, indent=2)
+    print(f"Pointed {updated} duplicate entries at their canonical link in {links_file}")
+    if unmerged:
+        # their direct_link is still the old canonical image's link
+        print(f"[WARN] {len(unmerged)} entries are no longer duplicates and need their own link; "
+              f"rerun generate_dropbox_links.py")
+    write_pages(links_file)
+    write_manifest(links_file)
+    return updated
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate question images with perceptual hashes")
+    parser.add_argument('--images', type=str, default=IMAGES_DIR,
+                       help='Root of the extracted question images')
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD,
+                       help=f'Maximum differing hash bits (out of {HASH_SIZE * HASH_SIZE}) to report as a near-duplicate')
+    parser.add_argument('--parsed', type=str, default=PARSED_DIR,
+                       help='Directory with the parsed answer keys')
+    parser.add_argument('--output', type=str, default=INDEX_FILE,
+                       help='Where to write the duplicate index')
+    parser.add_argument('--apply', action='store_true',
+                       help=f'Point exact duplicate entries in {LINKS_FILE} at the canonical image link')
+    args = parser.parse_args()
+
+    answers = load_answers(args.parsed)
+    print(f"Loaded {len(answers)} answers from {args.parsed}/")
+    report = QuestionImageDeduplicator(args.images, args.threshold, answers).build()
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[OK] {report['total_images']} images, {report['unique_images']} unique, "
+          f"{report['duplicate_images']} exact duplicates, "
+          f"{report['review_images']} near-duplicates to review in {len(report['review_clusters'])} clusters")
+    for cluster in report["review_clusters"][:10]:
+        print(f"  {cluster['canonical']} ({cluster['answer']}) ~ "
+              + ", ".join(f"{m['path']} ({m['answer']}, distance {m['distance']})" for m in cluster["review"]))
+    print(f"Index saved to: {args.output}")
+    if args.apply:
+        apply_to_links(report["canonical_map"])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+LINKS_FILE = "dropbox_question_links.json"
+MANIFEST_FILE = "asset_manifest.json"
+HASH_LENGTH = 16
+# the viewer itself, precached by sw.js so a page loads without the network
+SHELL_FILES = ["index.html", "about.html", "categories.html", "categories.css", "categories.js",
+               "questions.html", "questions.css", "questions.js", "styles.css"]
+PAGES_DIR = "pages"
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+def hash_file(path: Path) -> str:
+    return hash_bytes(path.read_bytes())
+
+def collect_data_entries(links_file: str = LINKS_FILE) -> List[Dict]:
+    entries = [{"path": links_file, "hash": hash_file(Path(links_file))}]
+    parsed_exams_dir = Path("parsed_exams")
+    if parsed_exams_dir.exists():
+        for answer_key_file in sorted(parsed_exams_dir.glob("*/*_answer_key.json")):
+            entries.append({
+                "path": answer_key_file.as_posix(),
+                "hash": hash_file(answer_key_file)
+            })
+    return entries
+
+def collect_shell_entries() -> List[Dict]:
+    paths = [Path(name) for name in SHELL_FILES] + sorted(Path(PAGES_DIR).glob("*.html"))
+    return [{"path": path.as_posix(), "hash": hash_file(path)} for path in paths if path.exists()]
+
+def collect_image_entries(questions: List[Dict]) -> List[Dict]:
+    entries = []
+    missing_local = 0
+    for q in questions:
+        local_path = q.get("local_path")
+        direct_link = q.get("direct_link")
+        if not local_path and not direct_link:
+            continue
+        image_file = Path(local_path) if local_path else None
+        if image_file is not None and image_file.exists():
+            image_hash = hash_file(image_file)
+        else:
+            # no local copy to hash, so the link itself is the best version marker we have
+            missing_local += 1
+            image_hash = hash_bytes(f"{local_path}|{direct_link}".encode("utf-8"))
+        entries.append({
+            "local_path": local_path,
+            "direct_link": direct_link,
+            "hash": image_hash
+        })
+    if missing_local:
+        print(f"  {missing_local} images not found locally, hashed by link instead")
+    return entries
+
+def build_manifest(links_file: str = LINKS_FILE) -> Dict:
+    with open(links_file, 'r', encoding='utf-8') as f:
+        questions = json.load(f)
+    shell_entries = collect_shell_entries()
+    data_entries = collect_data_entries(links_file)
+    image_entries = collect_image_entries(questions)
+    version_source = json.dumps([shell_entries, data_entries, image_entries], sort_keys=True)
+    return {
+        "version": hash_bytes(version_source.encode("utf-8")),
+        "shell": shell_entries,
+        "data": data_entries,
+        "images": image_entries
+    }
+
+def write_manifest(links_file: str = LINKS_FILE, output_path: str = MANIFEST_FILE) -> Dict:
+    manifest = build_manifest(links_file)
+    previous_version = None
+    if Path(output_path).exists():
+        with open(output_path, 'r', encoding='utf-8') as f:
+            previous_version = json.load(f).get("version")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Manifest version {manifest['version']}: {len(manifest['shell'])} shell files, "
+          f"{len(manifest['data'])} data files, {len(manifest['images'])} images")
+    if previous_version == manifest["version"]:
+        print("No assets changed since the last manifest")
+    print(f"Output saved to: {output_path}")
+    return manifest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Content-hashed asset manifest for the question viewer")
+    parser.add_argument('--links', type=str, default=LINKS_FILE,
+                       help='Question link database to build the manifest from')
+    parser.add_argument('--output', type=str, default=MANIFEST_FILE,
+                       help='Where to write the manifest')
+    args = parser.parse_args()
+    write_manifest(args.links, args.output)
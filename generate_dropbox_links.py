@@ -6,6 +6,8 @@ from dropbox.exceptions import ApiError
 import time
 import argparse
 import shutil
+from generate_asset_manifest import write_manifest
+from generate_static_pages import write_pages
 
 class DropboxLinkGenerator:
     def __init__(self, access_token):
@@ -42,6 +44,19 @@ class DropboxLinkGenerator:
         )
         return self.convert_to_direct_link(shared_link_metadata.url)
 
+    def recreate_shared_link(self, file_path):
+        links = self.dbx.sharing_list_shared_links(path=file_path).links
+        for link in links:
+            self.dbx.sharing_revoke_shared_link(link.url)
+        time.sleep(0.05)
+        shared_link = self.dbx.sharing_create_shared_link_with_settings(
+            file_path,
+            settings=dropbox.sharing.SharedLinkSettings(
+                requested_visibility=dropbox.sharing.RequestedVisibility.public
+            )
+        )
+        return self.convert_to_direct_link(shared_link.url)
+
     def convert_to_direct_link(self, url):
         if "?dl=0" in url:
             return url.replace("?dl=0", "?raw=1")
@@ -83,6 +98,11 @@ def generate_question_database(access_token):
     answer_keys = load_all_answer_keys()
     print("\n[3/4] Fetching files from Dropbox...")
     files = generator.list_folder_recursive("/question_images")
+    # imported here so the link tools don't need Pillow unless the dedupe index is read
+    from dedupe_question_images import load_canonical_map
+    canonical_map = load_canonical_map()
+    if canonical_map:
+        print(f"  {len(canonical_map)} duplicate images will reuse their canonical link")
     print(f"\n[4/4] Generating links for {len(files)} files...")
     question_database = []
     for i, file_entry in enumerate(files):
@@ -94,8 +114,9 @@ def generate_question_database(access_token):
         if (i + 1) % 50 == 0:
             print(f"  Progress: {i+1}/{len(files)} files processed...")
 
-        direct_link = generator.get_shared_link(file_path)
         local_path = file_path.lstrip("/")
+        # duplicates get their canonical image's link once every link is known
+        direct_link = None if local_path in canonical_map else generator.get_shared_link(file_path)
         answer_data = answer_keys.get(local_path, {})
         question_entry = {
             "dropbox_path": file_path,
@@ -106,8 +127,52 @@ def generate_question_database(access_token):
             "question_number": answer_data.get("question_number", None),
             "answer": answer_data.get("answer", None)
         }
+        if local_path in canonical_map:
+            question_entry["duplicate_of"] = canonical_map[local_path]
         question_database.append(question_entry)
 
+    # duplicates that were never uploaded still need an entry, pointing at the canonical file
+    listed = {q["local_path"] for q in question_database}
+    for local_path, canonical_path in sorted(canonical_map.items()):
+        if local_path in listed:
+            continue
+        answer_data = answer_keys.get(local_path, {})
+        question_database.append({
+            "dropbox_path": "/" + canonical_path,
+            "local_path": local_path,
+            "direct_link": None,
+            "exam_year": answer_data.get("exam_year", None),
+            "exam_type": answer_data.get("exam_type", None),
+            "question_number": answer_data.get("question_number", None),
+            "answer": answer_data.get("answer", None),
+            "duplicate_of": canonical_path
+        })
+
+    links = {q["local_path"]: q["direct_link"] for q in question_database if q["direct_link"]}
+    missing_canonicals = set()
+    for q in question_database:
+        if q["direct_link"] is not None:
+            continue
+        canonical = q["duplicate_of"]
+        if canonical not in links and canonical not in missing_canonicals:
+            try:
+                links[canonical] = generator.get_shared_link("/" + canonical)
+            except ApiError as e:
+                print(f"  [WARN] No link for canonical image /{canonical}: {e}")
+                missing_canonicals.add(canonical)
+        if canonical in links:
+            q["direct_link"] = links[canonical]
+            continue
+        # canonical was never uploaded, so the duplicate has to stand on its own
+        del q["duplicate_of"]
+        if q["dropbox_path"] != "/" + canonical:
+            try:
+                q["direct_link"] = generator.get_shared_link(q["dropbox_path"])
+            except ApiError as e:
+                print(f"  [FAIL] {q['dropbox_path']}: {e}")
+    if missing_canonicals:
+        print(f"  {len(missing_canonicals)} canonical images are missing; their duplicates keep their own link")
+
     def sort_key(x):
         year = x["exam_year"] if isinstance(x["exam_year"], int) else 9999
         exam_type = x["exam_type"] or ""
@@ -119,7 +184,15 @@ def generate_question_database(access_token):
         json.dump(question_database, f, indent=2)
     print(f"Generated {len(question_database)} question entries")
     print(f"Output saved to: dropbox_question_links.json")
+    write_pages()
+    write_manifest()
+
 
+def linked_path(question):
+# the file whose link an entry carries; duplicates carry their canonical image's link
+    if question.get('duplicate_of'):
+        return '/' + question['duplicate_of']
+    return question['dropbox_path']
 
 def fix_dropbox_links(access_token):
 # previously, was "fo" instead of "fi"
@@ -130,33 +203,24 @@ def fix_dropbox_links(access_token):
         questions = json.load(f)
     print(f"Loaded {len(questions)} questions\n")
     print("[2/3] Identifying folder shared links...")
-    files_needing_links = [q for q in questions if '/scl/fo/' in q['direct_link']]
+    files_needing_links = sorted({linked_path(q) for q in questions if '/scl/fo/' in q['direct_link']})
     print(f"{len(files_needing_links)} files with folder links\n")
     print(f"[3/3] individual file links for {len(files_needing_links)} files...")
 
-    for i, q in enumerate(files_needing_links):
-        file_path = q['dropbox_path']
+    for i, file_path in enumerate(files_needing_links):
         if (i + 1) % 100 == 0:
             print(f"  Progress: {i+1}/{len(files_needing_links)} files processed...")
-        links = generator.dbx.sharing_list_shared_links(path=file_path).links
-        for link in links:
-            generator.dbx.sharing_revoke_shared_link(link.url)
-        time.sleep(0.05)
-        shared_link = generator.dbx.sharing_create_shared_link_with_settings(
-            file_path,
-            settings=dropbox.sharing.SharedLinkSettings(
-                requested_visibility=dropbox.sharing.RequestedVisibility.public
-            )
-        )
-        direct_url = generator.convert_to_direct_link(shared_link.url)
+        direct_url = generator.recreate_shared_link(file_path)
         for question in questions:
-            if question['dropbox_path'] == file_path:
+            if linked_path(question) == file_path:
                 question['direct_link'] = direct_url
     print(f"Fixed {len(files_needing_links)} links")
     shutil.copy('dropbox_question_links.json', 'dropbox_question_links.json.backup')
     with open('dropbox_question_links.json', 'w') as f:
         json.dump(questions, f, indent=2)
     print(f"Saved updated links")
+    write_pages()
+    write_manifest()
     folder_count = sum(1 for q in questions if '/scl/fo/' in q.get('direct_link', ''))
     file_count = sum(1 for q in questions if '/scl/fi/' in q.get('direct_link', ''))
     if folder_count > 0:
@@ -164,6 +228,37 @@ def fix_dropbox_links(access_token):
     else:
         print(f"\nAll links fixed")
 
+def regenerate_links(access_token, dropbox_paths, links_file='dropbox_question_links.json'):
+# recreate links for specific files, e.g. the failures from check_dropbox_links.py
+    generator = DropboxLinkGenerator(access_token)
+    with open(links_file, 'r') as f:
+        questions = json.load(f)
+    requested = set(dropbox_paths)
+    # a duplicate's link is its canonical image's link, so that is the one to recreate
+    dropbox_paths = sorted({linked_path(q) for q in questions if q['dropbox_path'] in requested})
+    print(f"Regenerating links for {len(dropbox_paths)} files...")
+    failed = []
+    for i, file_path in enumerate(dropbox_paths):
+        if (i + 1) % 100 == 0:
+            print(f"  Progress: {i+1}/{len(dropbox_paths)} files processed...")
+        try:
+            direct_url = generator.recreate_shared_link(file_path)
+        except ApiError as e:
+            print(f"  [FAIL] {file_path}: {e}")
+            failed.append(file_path)
+            continue
+        for question in questions:
+            if linked_path(question) == file_path:
+                question['direct_link'] = direct_url
+    print(f"Regenerated {len(dropbox_paths) - len(failed)} links")
+    shutil.copy(links_file, f"{links_file}.backup")
+    with open(links_file, 'w') as f:
+        json.dump(questions, f, indent=2)
+    print(f"Saved updated links to {links_file}")
+    write_pages(links_file)
+    write_manifest(links_file)
+    return failed
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Dropbox Chemistry Olympiad Question Link Generator")
     parser.add_argument('--fix-links', action='store_true',
@@ -0,0 +1,167 @@
+import json
+import html
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, List, Tuple
+from generate_asset_manifest import write_manifest
+
+LINKS_FILE = "dropbox_question_links.json"
+TEMPLATE_FILE = "questions.html"
+OUTPUT_DIR = "pages"
+PRELOAD_IMAGES = 3
+PAGE_PATTERNS = ["exam-*.html", "category-*.html"]
+
+# mirrors CATEGORY_RANGES / CATEGORY_NAMES in questions.js
+CATEGORIES = [
+    ("stoichiometry", "Stoichiometry/Solutions", (1, 6)),
+    ("descriptive", "Descriptive/Laboratory", (7, 12)),
+    ("states", "States of Matter", (13, 18)),
+    ("thermodynamics", "Thermodynamics", (19, 24)),
+    ("kinetics", "Kinetics", (25, 30)),
+    ("equilibrium", "Equilibrium", (31, 36)),
+    ("redox", "Oxidation-Reduction", (37, 42)),
+    ("atomic", "Atomic Structure/Periodicity", (43, 48)),
+    ("bonding", "Bonding/Molecular Structure", (49, 54)),
+    ("organic", "Organic/Biochemistry", (55, 60)),
+]
+
+PAGE_FIELDS = ["direct_link", "local_path", "exam_year", "exam_type", "question_number", "answer"]
+
+class StaticPageGenerator:
+    def __init__(self, links_file: str = LINKS_FILE, template_file: str = TEMPLATE_FILE,
+                 output_dir: str = OUTPUT_DIR):
+        with open(links_file, 'r', encoding='utf-8') as f:
+            self.questions = json.load(f)
+        with open(template_file, 'r', encoding='utf-8') as f:
+            self.template = f.read()
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.written = []
+        self.unchanged = []
+
+    def generate_all(self):
+        pages = self._exam_pages() + self._category_pages()
+        print(f"Rendering {len(pages)} pages into {self.output_dir}/")
+        for name, page in pages:
+            self._write_page(name, self._render(page))
+        removed = self._remove_stale({name for name, _ in pages})
+        print(f"[OK] Written: {len(self.written)}, unchanged: {len(self.unchanged)}, removed: {removed}")
+
+    def _exam_pages(self) -> List[Tuple[str, Dict]]:
+        exams: Dict[Tuple[int, str], List[Dict]] = {}
+        for q in self.questions:
+            if isinstance(q.get("exam_year"), int) and q.get("exam_type"):
+                exams.setdefault((q["exam_year"], q["exam_type"]), []).append(q)
+
+        pages = []
+        for (year, exam_type), exam_questions in sorted(exams.items()):
+            exam_questions.sort(key=lambda q: q["question_number"] or 0)
+            type_display = "Local" if exam_type == "local" else "National"
+            pages.append((f"exam-{year}-{exam_type}.html", {
+                "mode": "exam",
+                "examYear": str(year),
+                "examType": exam_type,
+                "category": None,
+                "title": f"{year} {type_display} Exam",
+                "questions": exam_questions,
+            }))
+        return pages
+
+    def _category_pages(self) -> List[Tuple[str, Dict]]:
+        pages = []
+        for slug, name, (min_q, max_q) in CATEGORIES:
+            category_questions = [q for q in self.questions
+                                  if isinstance(q.get("question_number"), int)
+                                  and min_q <= q["question_number"] <= max_q
+                                  and (q.get("answer") or "").strip()
+                                  and not q.get("duplicate_of")]
+            # the viewer shuffles category questions and opens on one of the first few, so
+            # those are the ones worth preloading; seeded per page to keep rebuilds stable
+            random.Random(slug).shuffle(category_questions)
+            pages.append((f"category-{slug}.html", {
+                "mode": "category",
+                "examYear": None,
+                "examType": None,
+                "category": slug,
+                "title": name,
+                "questions": category_questions,
+            }))
+        return pages
+
+    def _render(self, page: Dict) -> str:
+        questions = [{field: q.get(field) for field in PAGE_FIELDS} for q in page["questions"]]
+        preload_urls = [q["direct_link"] or q["local_path"] for q in questions[:PRELOAD_IMAGES]]
+        data = {
+            "mode": page["mode"],
+            "examYear": page["examYear"],
+            "examType": page["examType"],
+            "category": page["category"],
+            "preloaded": len(preload_urls),
+            "questions": questions,
+        }
+        data_json = json.dumps(data, separators=(",", ":"), ensure_ascii=False).replace("</", "<\\/")
+
+        # no crossorigin: the img/preload requests are no-cors and would not reuse a cors-mode socket;
+        # raw=1 links redirect from www.dropbox.com to dl.dropboxusercontent.com, so warm both
+        head = ['    <base href="../">',
+                '    <link rel="preconnect" href="https://www.dropbox.com">',
+                '    <link rel="preconnect" href="https://dl.dropboxusercontent.com">']
+        head += [f'    <link rel="preload" as="image" href="{html.escape(url)}">' for url in preload_urls if url]
+        out = self._replace_once(self.template, "    <title>", "\n".join(head) + "\n    <title>")
+        out = self._replace_once(out, "<title>Questions - Chemistry Olympiad</title>",
+                                 f"<title>{html.escape(page['title'])} - Chemistry Olympiad</title>")
+        out = self._replace_once(out, '<h2 id="exam-info" class="exam-title">Loading...</h2>',
+                                 f'<h2 id="exam-info" class="exam-title">{html.escape(page["title"])}</h2>')
+        out = self._replace_once(out, '<p id="question-counter" class="total-questions">Total questions: ...</p>',
+                                 f'<p id="question-counter" class="total-questions">Total questions: {len(questions)}</p>')
+        if page["mode"] == "exam" and preload_urls and preload_urls[0]:
+            # exam pages open on question 1, so its image can start before any script runs
+            out = self._replace_once(out, '<img id="question-image" src=""',
+                                     f'<img id="question-image" src="{html.escape(preload_urls[0])}"')
+        out = self._replace_once(out, '    <script src="questions.js"></script>',
+                                 f'    <script>window.PRERENDERED_PAGE = {data_json};</script>\n'
+                                 f'    <script src="questions.js"></script>')
+        return out
+
+    def _replace_once(self, text: str, old: str, new: str) -> str:
+        if text.count(old) != 1:
+            raise ValueError(f"Template {TEMPLATE_FILE} no longer contains exactly one {old!r}")
+        return text.replace(old, new)
+
+    def _write_page(self, name: str, content: str):
+        path = self.output_dir / name
+        # only touch pages whose content changed, so rebuilds stay incremental for uploads/caches
+        if path.exists() and path.read_text(encoding='utf-8') == content:
+            self.unchanged.append(name)
+            return
+        path.write_text(content, encoding='utf-8')
+        self.written.append(name)
+
+    def _remove_stale(self, names: set) -> int:
+        removed = 0
+        # only pages this generator names, so --output . can't take index.html and friends with it
+        for pattern in PAGE_PATTERNS:
+            for path in self.output_dir.glob(pattern):
+                if path.name not in names:
+                    path.unlink()
+                    removed += 1
+        return removed
+
+def write_pages(links_file: str = LINKS_FILE, output_dir: str = OUTPUT_DIR):
+    StaticPageGenerator(links_file, output_dir=output_dir).generate_all()
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render exam and category pages with inlined question data")
+    parser.add_argument('--links', type=str, default=LINKS_FILE,
+                       help='Question link database to render from')
+    parser.add_argument('--output', type=str, default=OUTPUT_DIR,
+                       help='Directory to write the pages into')
+    args = parser.parse_args()
+    write_pages(args.links, args.output)
+    if Path(args.output) == Path(OUTPUT_DIR):
+        # sw.js precaches pages/ by hash, so it needs to see the new ones
+        write_manifest(args.links)
+
+if __name__ == "__main__":
+    main()
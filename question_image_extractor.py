@@ -2,9 +2,50 @@ import fitz
 import pdfplumber
 import json
 import os
+import hashlib
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+RENDER_SCALE = 3.0
+# bump when the way pixmaps are encoded changes, so cached PNGs get re-rendered
+ENCODING_PROFILE = "png-default-v1"
+BBOX_PRECISION = 1
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class RenderCache:
+    def __init__(self, index_path: Path):
+        self.index_path = index_path
+        self.entries: Dict[str, Dict[str, str]] = {}
+        if index_path.exists():
+            with open(index_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def make_key(pdf_hash: str, page_num: int, bbox: Dict[str, float]) -> str:
+        rounded = ",".join(f"{bbox[k]:.{BBOX_PRECISION}f}" for k in ('x0', 'y0', 'x1', 'y1'))
+        return f"{pdf_hash}|p{page_num}|{rounded}|x{RENDER_SCALE}|{ENCODING_PROFILE}"
+
+    def is_fresh(self, output_path: Path, key: str) -> bool:
+        entry = self.entries.get(output_path.as_posix())
+        if not entry or entry['key'] != key or not output_path.exists():
+            return False
+        # the file must still be the one we rendered, not something edited or replaced since
+        return file_sha256(output_path) == entry['sha256']
+
+    def record(self, output_path: Path, key: str):
+        self.entries[output_path.as_posix()] = {'key': key, 'sha256': file_sha256(output_path)}
+
+    def save(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+
 class QuestionImageExtractor:
     def __init__(self, pdf_path: str, parsed_json_path: str, exam_type: str = "local", output_dir: str = "question_images"):
         self.pdf_path = pdf_path
@@ -19,43 +60,69 @@ class QuestionImageExtractor:
         self.exam_output_dir = Path(output_dir) / str(self.exam_year) / exam_type
         self.exam_output_dir.mkdir(parents=True, exist_ok=True)
         self.file_sizes = []
+        self.questions_by_number = {q['number']: q for q in self.questions}
+        self.words_by_page: Dict[int, List[Dict]] = {}
+        self.pdf_hash = file_sha256(pdf_path)
+        self.render_cache = RenderCache(Path(output_dir) / ".render_cache.json")
+        self.rendered_count = 0
+        self.reused_count = 0
 
     def extract_all_questions(self):
         print(f"Extract images for {len(self.questions)} questions")
         print(f"Output directory: {self.exam_output_dir}")
         for question in self.questions:
-            self._extract_question_image(question)
-            print(f"  [OK] Question {question['number']:2d} extracted")
+            reused = self._extract_question_image(question)
+            status = "unchanged" if reused else "extracted"
+            print(f"  [OK] Question {question['number']:2d} {status}")
+        self.render_cache.save()
         self._update_json_with_paths()
         self._generate_answer_key()
         self._print_summary()
 
-    def _extract_question_image(self, question: Dict):
+    def _extract_question_image(self, question: Dict) -> bool:
         q_num = question['number']
         page_num = question['page_number']
-        bbox = self._find_question_bbox(question)
-        page = self.pdf_fitz[page_num - 1]
-        rect = fitz.Rect(bbox['x0'], bbox['y0'], bbox['x1'], bbox['y1'])
-        mat = fitz.Matrix(3.0, 3.0)
-        pix = page.get_pixmap(matrix=mat, clip=rect)
+        # render from the rounded bbox so the cache key fully determines the output
+        bbox = {k: round(v, BBOX_PRECISION) for k, v in self._find_question_bbox(question).items()}
         output_path = self.exam_output_dir / f"q{q_num:02d}.png"
-        pix.save(str(output_path))
+        cache_key = RenderCache.make_key(self.pdf_hash, page_num, bbox)
+        reused = self.render_cache.is_fresh(output_path, cache_key)
+        if reused:
+            # same pdf, crop and encoding as last run, so keep the existing file byte-for-byte
+            self.reused_count += 1
+        else:
+            page = self.pdf_fitz[page_num - 1]
+            rect = fitz.Rect(bbox['x0'], bbox['y0'], bbox['x1'], bbox['y1'])
+            mat = fitz.Matrix(RENDER_SCALE, RENDER_SCALE)
+            pix = page.get_pixmap(matrix=mat, clip=rect)
+            pix.save(str(output_path))
+            self.render_cache.record(output_path, cache_key)
+            self.rendered_count += 1
         file_size = output_path.stat().st_size / 1024
         self.file_sizes.append(file_size)
         question['image_path'] = f"question_images/{self.exam_year}/{self.exam_type}/q{q_num:02d}.png"
+        return reused
+
+    def _page_words(self, page_num: int) -> List[Dict]:
+        if page_num not in self.words_by_page:
+            self.words_by_page[page_num] = self.pdf_plumber.pages[page_num - 1].extract_words()
+        return self.words_by_page[page_num]
 
     def _find_question_bbox(self, question: Dict) -> Dict[str, float]:
         q_num = question['number']
         page_num = question['page_number']
         page = self.pdf_plumber.pages[page_num - 1]
-        words = page.extract_words()
-        q_start_pattern = f"{q_num}."
-        start_words = [w for w in words if w['text'] == q_start_pattern]
+        # fast-mode parses (USNCOAnchorParser) carry the anchor position, so the page only
+        # needs its words extracted for the last question of a column
+        if question.get('anchor'):
+            start_word = question['anchor']
+        else:
+            q_start_pattern = f"{q_num}."
+            start_words = [w for w in self._page_words(page_num) if w['text'] == q_start_pattern]
+            if not start_words:
+                raise ValueError(f"Cannot find start of question {q_num}")
+            start_word = start_words[0]
 
-        if not start_words:
-            raise ValueError(f"Cannot find start of question {q_num}")
-        
-        start_word = start_words[0]
         page_width = page.width
         page_height = page.height
         mid_x = page_width / 2
@@ -69,14 +136,21 @@ class QuestionImageExtractor:
 
         y0 = start_word['top'] - 5
         next_q_num = q_num + 1
-        next_q_pattern = f"{next_q_num}."
-        next_words = [w for w in words
-                     if w['text'] == next_q_pattern
-                     and ((in_left_column and w['x0'] < mid_x) or
-                          (not in_left_column and w['x0'] >= mid_x))]
+        next_question = self.questions_by_number.get(next_q_num)
+        if question.get('anchor') and next_question and next_question.get('anchor'):
+            next_anchor = next_question['anchor']
+            same_column = (next_anchor['x0'] < mid_x) == in_left_column
+            next_words = [next_anchor] if next_question['page_number'] == page_num and same_column else []
+        else:
+            next_q_pattern = f"{next_q_num}."
+            next_words = [w for w in self._page_words(page_num)
+                         if w['text'] == next_q_pattern
+                         and ((in_left_column and w['x0'] < mid_x) or
+                              (not in_left_column and w['x0'] >= mid_x))]
         if next_words:
             y1 = next_words[0]['top'] - 3
         else:
+            words = self._page_words(page_num)
             col_words = [w for w in words
                         if (in_left_column and w['x0'] < mid_x) or
                            (not in_left_column and w['x0'] >= mid_x)]
@@ -156,6 +230,7 @@ class QuestionImageExtractor:
     def _print_summary(self):
         print("IMAGE EXTRACTION DONE")
         print(f"\n[OK] Extracted: {len(self.questions)} questions")
+        print(f"[OK] Rendered: {self.rendered_count}, reused from cache: {self.reused_count}")
         print(f"[OK] Output: {self.exam_output_dir}")
 
         if self.file_sizes:
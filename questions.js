@@ -45,16 +45,41 @@ document.addEventListener('DOMContentLoaded', async () => {
     examType = urlParams.get('type') || 'local';
     examYear = urlParams.get('year') || '2023';
     category = urlParams.get('category');
+    if (window.PRERENDERED_PAGE) {
+        mode = window.PRERENDERED_PAGE.mode;
+        examType = window.PRERENDERED_PAGE.examType || examType;
+        examYear = window.PRERENDERED_PAGE.examYear || examYear;
+        category = window.PRERENDERED_PAGE.category;
+    }
 
+    registerServiceWorker();
     await loadQuestions();
     preloadUpcomingImages();
     displayQuestion();
     setupEventListeners();
 });
 
+// Pages built by generate_static_pages.py inline their questions, so no fetch is needed
+function loadPrerenderedQuestions(page) {
+    questions = page.questions;
+    if (mode === 'category') {
+        const preloaded = questions.slice(0, page.preloaded);
+        shuffleArray(questions);
+        // open on one of the images the page already preloads
+        if (preloaded.length > 0) {
+            const first = preloaded[Math.floor(Math.random() * preloaded.length)];
+            const firstIndex = questions.indexOf(first);
+            [questions[0], questions[firstIndex]] = [questions[firstIndex], questions[0]];
+        }
+    }
+    console.log(`Loaded ${questions.length} pre-rendered questions (${mode})`);
+}
+
 async function loadQuestions() {
     try {
-        if (mode === 'category' && category) {
+        if (window.PRERENDERED_PAGE) {
+            loadPrerenderedQuestions(window.PRERENDERED_PAGE);
+        } else if (mode === 'category' && category) {
             const categoryRange = CATEGORY_RANGES[category];
             const categoryName = CATEGORY_NAMES[category];
 
@@ -71,7 +96,7 @@ async function loadQuestions() {
             const [minQ, maxQ] = categoryRange;
             questions = allQuestions.filter(q => {
                 const qNum = q.question_number;
-                return qNum >= minQ && qNum <= maxQ && q.answer && q.answer.trim() !== '';
+                return qNum >= minQ && qNum <= maxQ && q.answer && q.answer.trim() !== '' && !q.duplicate_of;
             });
 
             shuffleArray(questions);
@@ -88,7 +113,8 @@ async function loadQuestions() {
                 throw new Error(`Failed to load questions: ${response.status}`);
             }
             allQuestions = await response.json();
-            allQuestions = allQuestions.filter(q => q.answer && q.answer.trim() !== '');
+            // duplicate_of marks reused questions (dedupe_question_images.py), show each one once
+            allQuestions = allQuestions.filter(q => q.answer && q.answer.trim() !== '' && !q.duplicate_of);
             shuffleArray(allQuestions);
             questions = allQuestions;
             const examInfo = document.getElementById('exam-info');
@@ -127,6 +153,16 @@ async function loadQuestions() {
     }
 }
 
+// Persistent data/image cache, invalidated per entry via asset_manifest.json
+function registerServiceWorker() {
+    if (!('serviceWorker' in navigator)) {
+        return;
+    }
+    navigator.serviceWorker.register('sw.js').catch(error => {
+        console.warn('Service worker registration failed:', error);
+    });
+}
+
 // Shuffle array using Fisher-Yates algorithm
 function shuffleArray(array) {
     for (let i = array.length - 1; i > 0; i--) {
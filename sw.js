@@ -0,0 +1,270 @@
+// Offline cache for the question viewer, driven by asset_manifest.json
+// (see generate_asset_manifest.py). Entries are only evicted when their hash changes.
+
+const MANIFEST_URL = 'asset_manifest.json';
+const NO_CORS_URL = 'no-cors-origins.json';
+const MANIFEST_CACHE = 'coly-manifest';
+const SHELL_CACHE = 'coly-shell';
+const DATA_CACHE = 'coly-data';
+const IMAGE_CACHE = 'coly-images';
+const MANIFEST_TIMEOUT_MS = 10000;
+const SHELL_DESTINATIONS = new Set(['document', 'script', 'style']);
+
+let indexReady = null;
+let syncStarted = false;
+let noCorsOrigins = null;
+let shellUrls = new Set();
+let dataUrls = new Set();
+let imageUrls = new Set();
+
+self.addEventListener('install', () => {
+    self.skipWaiting();
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil(self.clients.claim());
+    startSync(event);
+});
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+
+    const url = stripQuery(request.url);
+    if (url === resolveUrl(MANIFEST_URL)) return;
+    if (request.destination !== 'image' && !SHELL_DESTINATIONS.has(request.destination) && !url.endsWith('.json')) return;
+
+    startSync(event);
+    event.respondWith(ensureIndex().then(() => {
+        const shellUrl = url.endsWith('/') ? url + 'index.html' : url;
+        if (shellUrls.has(shellUrl)) {
+            return cacheFirst(event, SHELL_CACHE, shellUrl, request);
+        }
+        if (dataUrls.has(url)) {
+            return cacheFirst(event, DATA_CACHE, url, request);
+        }
+        if (imageUrls.has(request.url)) {
+            return cacheFirst(event, IMAGE_CACHE, request.url, request);
+        }
+        return fetch(request);
+    }));
+});
+
+// Requests are answered from the manifest we already have; only Cache Storage is read here.
+function ensureIndex() {
+    if (!indexReady) {
+        indexReady = loadCachedManifest().then(indexManifest).catch((error) => {
+            console.warn('Failed to read cached manifest:', error);
+        });
+    }
+    return indexReady;
+}
+
+// Checked once per worker lifetime, in the background; the browser stops idle workers, so each new visit re-checks.
+function startSync(event) {
+    if (syncStarted) return;
+    syncStarted = true;
+    event.waitUntil(syncManifest().catch((error) => {
+        console.warn('Manifest sync failed, keeping cached manifest:', error);
+    }));
+}
+
+async function syncManifest() {
+    const controller = new AbortController();
+    const timer = setTimeout(() => controller.abort(), MANIFEST_TIMEOUT_MS);
+    let response;
+    try {
+        response = await fetch(MANIFEST_URL, { cache: 'no-cache', signal: controller.signal });
+    } finally {
+        clearTimeout(timer);
+    }
+    if (!response.ok) {
+        throw new Error(`Failed to load manifest: ${response.status}`);
+    }
+    const manifest = await response.clone().json();
+    const previous = await loadCachedManifest();
+
+    if (!previous || previous.version !== manifest.version) {
+        await invalidateChanged(previous, manifest);
+        const manifestCache = await caches.open(MANIFEST_CACHE);
+        await manifestCache.put(MANIFEST_URL, response);
+        console.log(`Asset manifest updated to ${manifest.version}`);
+    }
+    await ensureIndex();
+    indexManifest(manifest);
+    await precacheShell(manifest);
+}
+
+// the pages, scripts and styles are fetched up front, so the next visit loads without the network
+async function precacheShell(manifest) {
+    const shellCache = await caches.open(SHELL_CACHE);
+    let added = 0;
+    for (const entry of manifest.shell || []) {
+        const url = resolveUrl(entry.path);
+        if (await shellCache.match(url)) continue;
+        try {
+            const response = await fetch(url, { cache: 'no-cache' });
+            if (isCacheable(SHELL_CACHE, response)) {
+                await shellCache.put(url, response);
+                added++;
+            }
+        } catch (error) {
+            console.warn('Failed to precache', url, error);
+        }
+    }
+    if (added) console.log(`Precached ${added} shell files`);
+}
+
+async function loadCachedManifest() {
+    const manifestCache = await caches.open(MANIFEST_CACHE);
+    const cached = await manifestCache.match(MANIFEST_URL);
+    return cached ? cached.json() : null;
+}
+
+async function invalidateChanged(previous, manifest) {
+    const shellCache = await caches.open(SHELL_CACHE);
+    const dataCache = await caches.open(DATA_CACHE);
+    const imageCache = await caches.open(IMAGE_CACHE);
+
+    if (!previous) {
+        // no record of what is cached, so nothing can be trusted
+        await clearCache(shellCache);
+        await clearCache(dataCache);
+        await clearCache(imageCache);
+        return;
+    }
+
+    await invalidatePaths(shellCache, previous.shell || [], manifest.shell || []);
+    await invalidatePaths(dataCache, previous.data, manifest.data);
+
+    const newImageHashes = new Map();
+    manifest.images.forEach(entry => {
+        imageKeys(entry).forEach(key => newImageHashes.set(key, entry.hash));
+    });
+    let evicted = 0;
+    for (const entry of previous.images) {
+        for (const key of imageKeys(entry)) {
+            if (newImageHashes.get(key) !== entry.hash && await imageCache.delete(key)) {
+                evicted++;
+            }
+        }
+    }
+    console.log(`Evicted ${evicted} changed images from cache`);
+}
+
+async function invalidatePaths(cache, previousEntries, entries) {
+    const newHashes = new Map(entries.map(entry => [resolveUrl(entry.path), entry.hash]));
+    for (const entry of previousEntries) {
+        const url = resolveUrl(entry.path);
+        if (newHashes.get(url) !== entry.hash) {
+            await cache.delete(url);
+        }
+    }
+}
+
+function indexManifest(manifest) {
+    if (!manifest) return;
+    shellUrls = new Set((manifest.shell || []).map(entry => resolveUrl(entry.path)));
+    dataUrls = new Set(manifest.data.map(entry => resolveUrl(entry.path)));
+    imageUrls = new Set();
+    manifest.images.forEach(entry => {
+        imageKeys(entry).forEach(key => imageUrls.add(key));
+    });
+}
+
+async function cacheFirst(event, cacheName, key, request) {
+    const cache = await caches.open(cacheName);
+    const cached = await cache.match(key);
+    if (cached) {
+        return cached;
+    }
+
+    const origin = new URL(key).origin;
+    const origins = await loadNoCorsOrigins();
+    let response;
+    let corsFailed = false;
+    if (!origins.has(origin)) {
+        try {
+            // cors lets us see the status and type, so error pages never end up cached
+            response = await fetch(key, { mode: 'cors', credentials: 'omit', cache: 'no-cache' });
+        } catch (error) {
+            corsFailed = true;
+        }
+    }
+    if (!response) {
+        response = await fetch(request);
+        if (corsFailed) {
+            // the page's own request got through, so it was the missing CORS headers (on the host or
+            // a host it redirects to), not the network; don't pay for the failed attempt again
+            rememberNoCors(event, origin);
+        }
+    }
+    if (isCacheable(cacheName, response)) {
+        // storing must never hold up or fail the response (e.g. QuotaExceededError)
+        event.waitUntil(cache.put(key, response.clone()).catch((error) => {
+            console.warn('Failed to cache', key, error);
+        }));
+    }
+    return response;
+}
+
+function isCacheable(cacheName, response) {
+    if (response.type === 'opaque') {
+        // status and type can't be read; only images from no-cors hosts end up here. The entry is
+        // still dropped when the manifest hash changes, and check_dropbox_links.py keeps links healthy
+        return cacheName === IMAGE_CACHE;
+    }
+    if (!response.ok) return false;
+    const contentType = response.headers.get('Content-Type') || '';
+    if (cacheName === IMAGE_CACHE) {
+        return contentType.startsWith('image/') || contentType.startsWith('application/octet-stream');
+    }
+    if (cacheName === SHELL_CACHE) {
+        // a redirected response can't answer a navigation
+        return !response.redirected && /html|javascript|css/.test(contentType);
+    }
+    return contentType.includes('json');
+}
+
+async function loadNoCorsOrigins() {
+    if (!noCorsOrigins) {
+        const manifestCache = await caches.open(MANIFEST_CACHE);
+        const cached = await manifestCache.match(NO_CORS_URL);
+        noCorsOrigins = new Set(cached ? await cached.json() : []);
+    }
+    return noCorsOrigins;
+}
+
+function rememberNoCors(event, origin) {
+    if (noCorsOrigins.has(origin)) return;
+    noCorsOrigins.add(origin);
+    console.warn(`${origin} sends no CORS headers; its images are fetched and cached no-cors from now on`);
+    const body = JSON.stringify([...noCorsOrigins]);
+    event.waitUntil(caches.open(MANIFEST_CACHE).then(manifestCache => manifestCache.put(NO_CORS_URL,
+        new Response(body, { headers: { 'Content-Type': 'application/json' } }))).catch((error) => {
+        console.warn('Failed to remember no-cors origin', origin, error);
+    }));
+}
+
+async function clearCache(cache) {
+    const keys = await cache.keys();
+    await Promise.all(keys.map(request => cache.delete(request)));
+}
+
+function imageKeys(entry) {
+    const keys = [];
+    if (entry.direct_link) keys.push(entry.direct_link);
+    if (entry.local_path) keys.push(resolveUrl(entry.local_path));
+    return keys;
+}
+
+function resolveUrl(path) {
+    return new URL(path, self.registration.scope).href;
+}
+
+function stripQuery(url) {
+    const parsed = new URL(url);
+    parsed.search = '';
+    parsed.hash = '';
+    return parsed.href;
+}
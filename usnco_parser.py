@@ -1,6 +1,9 @@
 import pdfplumber
+import fitz
 import re
 import json
+import time
+from collections import Counter
 from dataclasses import dataclass, asdict
 from typing import List, Dict, Optional
 from pathlib import Path
@@ -364,8 +367,147 @@ class USNCOParser:
             json.dump(data, f, indent=2, ensure_ascii=False)
         print(f"\nJSON saved to: {output_path}")
 
+# fast mode: only the answer key and the page of each "N." anchor, which is all
+# question_image_extractor.py and the website need; no text/choice parsing
+class USNCOAnchorParser:
+    anchor_pattern = re.compile(r'^(\d+)\.$')
+    default_max_question = 60
+    line_tolerance = 3
+    margin_tolerance = 3
+
+    def __init__(self, pdf_path: str, exam_year: int = 2018):
+        self.pdf_path = pdf_path
+        self.exam_year = exam_year
+        self.questions: List[Dict] = []
+        self.parsing_issues: List[ParsingIssue] = []
+        self.answer_key: Dict[int, str] = {}
+
+    def parse(self) -> Dict:
+        print(f"Opening PDF (fast mode): {self.pdf_path}")
+        # font-size glyph boxes put word tops where pdfplumber puts them, so anchor-based crops
+        # match the ones QuestionImageExtractor computes from pdfplumber words
+        fitz.TOOLS.set_small_glyph_heights(True)
+        try:
+            anchors = self._read_anchors()
+        finally:
+            fitz.TOOLS.set_small_glyph_heights(False)
+
+        for q_num, (page_number, x0, top) in sorted(anchors.items()):
+            question = asdict(Question(
+                number=q_num,
+                text="",
+                choices={},
+                correct_answer=self.answer_key.get(q_num, ""),
+                page_number=page_number,
+                parsing_confidence='anchor-only'
+            ))
+            # position of the "N." word, so question_image_extractor.py needn't search for it again
+            question['anchor'] = {'x0': round(x0, 2), 'top': round(top, 2)}
+            self.questions.append(question)
+        self._check_coverage(anchors)
+        return {
+            "exam_year": self.exam_year,
+            "total_questions": len(self.questions),
+            "questions": self.questions,
+            "parsing_issues": [asdict(issue) for issue in self.parsing_issues],
+        }
+
+    def _read_anchors(self) -> Dict[int, tuple]:
+        candidates = []
+        with fitz.open(self.pdf_path) as pdf:
+            total_pages = len(pdf)
+            self._extract_answer_key(pdf[-1])
+            print(f"Found {len(self.answer_key)} answers in key")
+            max_question = max(self.answer_key, default=self.default_max_question)
+            for page_num in range(2, total_pages - 1):
+                for q_num, x0, top, column in self._find_anchors(pdf[page_num]):
+                    if q_num <= max_question:
+                        candidates.append((q_num, page_num + 1, x0, top, column))
+        on_margin = self._on_margin(candidates)
+        run = self._longest_run(on_margin)
+        skipped = len(candidates) - len(run)
+        if skipped:
+            print(f"Skipped {skipped} line-leading numbers that are not question anchors")
+        return {q_num: (page_number, x0, top) for q_num, page_number, x0, top, _ in run}
+
+    def _on_margin(self, candidates: List[tuple]) -> List[tuple]:
+        # question numbers hang at the column's left margin; an indented "N." is a list item or wrapped text
+        margins = {}
+        for column in {c[4] for c in candidates}:
+            margins[column] = Counter(round(c[2]) for c in candidates if c[4] == column).most_common(1)[0][0]
+        return [c for c in candidates if abs(c[2] - margins[c[4]]) <= self.margin_tolerance]
+
+    def _longest_run(self, candidates: List[tuple]) -> List[tuple]:
+        # questions appear in order, but wrapped text can start a line with any number (a "30." inside
+        # question 7 must not swallow 8-29), so keep the longest increasing run in reading order,
+        # preferring runs where each number is the previous one + 1. On a tie the later candidate wins:
+        # a stray "8." in question 7's text comes before the real question 8
+        best = []
+        for i, candidate in enumerate(candidates):
+            score, previous = (1, 0), None
+            for j in range(i):
+                if candidates[j][0] < candidate[0]:
+                    length, consecutive = best[j][0]
+                    option = (length + 1, consecutive + (candidates[j][0] == candidate[0] - 1))
+                    if option >= score:
+                        score, previous = option, j
+            best.append((score, previous))
+        end = max(reversed(range(len(candidates))), key=lambda i: best[i][0], default=None)
+        run = []
+        while end is not None:
+            run.append(candidates[end])
+            end = best[end][1]
+        return run[::-1]
+
+    def _extract_answer_key(self, page):
+        # text order follows the content stream, not the layout (a key drawn as a table may list every
+        # number before any answer), so rebuild visual lines from word positions first
+        words = sorted(page.get_text("words"), key=lambda w: ((w[1] + w[3]) / 2, w[0]))
+        lines = []
+        for w in words:
+            mid_y = (w[1] + w[3]) / 2
+            if lines and abs(lines[-1][0] - mid_y) <= self.line_tolerance:
+                lines[-1][1].append(w)
+            else:
+                lines.append((mid_y, [w]))
+        for _, line_words in lines:
+            text = " ".join(w[4] for w in sorted(line_words, key=lambda w: w[0]))
+            for q_num, answer in re.findall(r'(\d+)\.\s+([A-D])\b', text):
+                self.answer_key[int(q_num)] = answer
+
+    def _find_anchors(self, page) -> List[tuple]:
+        mid_x = page.rect.width / 2
+        found = []
+        # words are (x0, y0, x1, y1, text, block_no, line_no, word_no); an anchor starts its line
+        for x0, y0, x1, y1, text, block_no, line_no, word_no in page.get_text("words"):
+            match = self.anchor_pattern.match(text)
+            if not match or word_no != 0:
+                continue
+            found.append((x0 >= mid_x, y0, x0, int(match.group(1))))
+        return [(q_num, x0, top, column) for column, top, x0, q_num in sorted(found)]
+
+    def _check_coverage(self, anchors: Dict[int, tuple]):
+        for q_num in sorted(set(self.answer_key) - set(anchors)):
+            self.parsing_issues.append(ParsingIssue(
+                question_number=q_num,
+                issue="No question anchor found for answer key entry",
+                needs_manual_review=True
+            ))
+        for q_num in sorted(set(anchors) - set(self.answer_key)):
+            self.parsing_issues.append(ParsingIssue(
+                question_number=q_num,
+                issue="No answer found in answer key",
+                needs_manual_review=True
+            ))
+
+    def save_json(self, output_path: str, data: Dict):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"\nJSON saved to: {output_path}")
+
 def main():
     exam_type = "national" # local/national
+    fast_mode = False # answers + anchors only, enough for question_image_extractor.py
     for exam_year in range(2000,2026):
         pdf_path = f"usnco-exams/{exam_year}-usnco-{exam_type}-exam-part-i.pdf"
 
@@ -379,8 +521,13 @@ def main():
             print(f"Error: PDF file not found at {pdf_path}")
             return
 
-        parser = USNCOParser(pdf_path, exam_year=exam_year)
+        start = time.perf_counter()
+        if fast_mode:
+            parser = USNCOAnchorParser(pdf_path, exam_year=exam_year)
+        else:
+            parser = USNCOParser(pdf_path, exam_year=exam_year)
         data = parser.parse()
+        print(f"Parsed in {time.perf_counter() - start:.2f}s")
         data['exam_type'] = exam_type
         parser.save_json(str(json_output), data)
         print(f"\nIssues:")